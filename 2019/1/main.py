@@ -1,4 +1,6 @@
 import csv
+from array import array
+from functools import lru_cache
 
 
 
@@ -21,4 +23,95 @@ def calculate_fuel_recursively(mass):
         return 0
     else:
         fuel = mass
-        return fuel + calculate_fuel_recursively(((mass // 3) - 2))
\ No newline at end of file
+        return fuel + calculate_fuel_recursively(((mass // 3) - 2))
+
+
+def as_mass_array(masses):
+    """
+    Copy masses into an array('q'), buffers of 64 bit integers (like an int64 numpy array) are copied as raw bytes
+    :param masses: any iterable or buffer of integer masses
+    :return: array('q')
+    """
+    try:
+        view = memoryview(masses)
+    except TypeError:
+        return array('q', masses)
+
+    if view.itemsize == 8 and view.format in ('q', 'l', '<q', '<l', '=q', '=l') and view.c_contiguous:
+        image = array('q')
+        image.frombytes(view.cast('B'))
+        return image
+    return array('q', view.tolist())
+
+
+def calculate_fuel_batch(masses):
+    """
+    Calculates the fuel needed for many modules at once, including the fuel for the fuel
+    This is a plain scalar loop over each module's chain, kept behind a batch signature so callers can hand over
+    a whole manifest in any buffer format. It measured faster than a pass-wise version over the modules still
+    needing fuel, and unlike calculate_fuel_recursively it can't hit the recursion limit
+    :param masses: any iterable or buffer of integer masses, like a list, array or numpy array
+    :return: (fuel per module as array('q'), total fuel)
+    """
+
+    fuel = array('q')
+    append = fuel.append
+    for mass in as_mass_array(masses):
+        total = 0
+        mass = mass // 3 - 2
+        while mass > 0:
+            total += mass
+            mass = mass // 3 - 2
+        append(total)
+
+    return fuel, sum(fuel)
+
+
+class FuelService:
+    """
+    Fuel requirements (fuel for the fuel included) with an LRU bounded cache keyed by mass
+    A module's chain goes through the requirement of its own fuel mass, so once any chain has passed through
+    a mass every later chain that reaches it reuses the cached tail
+    """
+
+    def __init__(self, maxsize=65536):
+        """
+        :param maxsize: most masses kept in the cache
+        """
+        self.requirement = lru_cache(maxsize=maxsize)(self.calculate_requirement)
+
+    def calculate_requirement(self, mass):
+        """
+        Fuel for a module of this mass, only called on a cache miss
+        :param mass: int
+        :return: fuel
+        """
+        fuel = mass // 3 - 2
+        if fuel <= 0:
+            return 0
+        return fuel + self.requirement(fuel)
+
+    def total(self, masses):
+        return sum(self.requirement(mass) for mass in masses)
+
+    @property
+    def hit_rate(self):
+        info = self.requirement.cache_info()
+        lookups = info.hits + info.misses
+        return info.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        :return: dictionary of hits, misses, hit_rate, size and maxsize
+        """
+        info = self.requirement.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": self.hit_rate,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+        }
+
+    def clear(self):
+        self.requirement.cache_clear()
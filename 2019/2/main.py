@@ -1,20 +1,45 @@
 import csv
+from array import array
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 class IntCodeComputer:
 
     def __init__(self, program):
         self.OPCODES = {
-            "1": "+",
-            "2": "*",
-            "99": "None"
+            1: self.do_add,
+            2: self.do_multiply,
         }
 
-        self.program = program
+        self.program = array('q', (int(value) for value in program))
         self.current_position = 0
         self.current_operation = None
         self.calculated_value = 0
         self.current_opcode = 0
 
+    def do_add(self, first_operand, second_operand, result_index):
+        self.program[result_index] = self.program[first_operand] + self.program[second_operand]
+
+    def do_multiply(self, first_operand, second_operand, result_index):
+        self.program[result_index] = self.program[first_operand] * self.program[second_operand]
+
+    def snapshot(self):
+        """
+        Copy the memory image so the machine can be rewound later
+        :return: array('q')
+        """
+        return self.program[:]
+
+    def restore(self, image):
+        """
+        Rewind the machine to a snapshot, the memory comes back in a single buffer copy
+        :param image: array('q') from snapshot()
+        :return: void
+        """
+        self.program[:] = image
+        self.current_position = 0
+        self.current_opcode = 0
+
     def process_program(self):
         """
         The program is a comma seperated list of numbers
@@ -26,11 +51,24 @@ class IntCodeComputer:
         if opcode is 99, terminate
         if opcode is unrecognized, something has gone wrong
         repeat
+
+        The opcode handlers are looked up once per instruction in the dispatch table,
+        the hot loop below is process_block inlined to skip a method call per instruction
         """
 
-        while self.current_opcode != 99:
-            self.process_block()
+        program = self.program
+        dispatch = self.OPCODES
+        position = self.current_position
+
+        while True:
+            handler = dispatch.get(program[position])
+            if handler is None:
+                self.current_opcode = 99
+                break
+            handler(program[position+1], program[position+2], program[position+3])
+            position += 4
 
+        self.current_position = position
 
     def process_block(self):
         """
@@ -40,40 +78,90 @@ class IntCodeComputer:
         :return:
         """
 
-        operation = self.program[self.current_position]
-        if operation not in ['1', '2']:
-           self.current_opcode = 99
-           return
-        else:
-            operation = self.OPCODES[operation]
+        handler = self.OPCODES.get(self.program[self.current_position])
+        if handler is None:
+            self.current_opcode = 99
+            return
 
-            first_operand = int(self.program[self.current_position+1])
-            second_operand = int(self.program[self.current_position+2])
-            result_index = int(self.program[self.current_position+3])
-            value = eval("{} {} {}".format(self.program[first_operand], operation, self.program[second_operand]))
-            self.program[result_index] = value
-            self.current_position = self.current_position + 4
+        position = self.current_position
+        handler(self.program[position+1], self.program[position+2], self.program[position+3])
+        self.current_position = position + 4
 
 #[21202657, '97', '11', 2, '1', '1', '2', '3', '1', '3', '4', '3', '1', '5', '0', '3', '2', '10', '1', 388, '1', '19', '6', 390, '2', '13', '23', 1950, '1', '27', '13', 1955, '1', '9', '31', 1958, '1', '35', '9', 1961, '1', '39', '5', 1962, '2', '6', '43', 3924, '1', '47', '6', 3926, '2', '51', '9', 11778, '2', '55', '13', 58890, '1', '59', '6', 58892, '1', '10', '63', 58896, '2', '67', '9', 176688, '2', '6', '71', 353376, '1', '75', '5', 353377, '2', '79', '10', 1413508, '1', '5', '83', 1413509, '2', '9', '87', 4240527, '1', '5', '91', 4240528, '2', '13', '95', 21202640, '1', '99', '10', 21202644, '1', '103', '2', 21202655, '1', '107', '6', '0', '99', '2', '14', '0', '0']
 
-def run_main():
-
-    for noun in xrange(0,100):
-        for verb in xrange(0,100):
-            with open("./scratch.txt") as input:
-                reader = csv.reader(input)
-                the_list = list(reader)
-                program = the_list[0]
+TARGET = 19690720
+
+# set by the pool initializer in every worker process
+_computer = None
+_image = None
+_found = None
+
+
+def read_program(file_name):
+    """
+    Parse the program once into an immutable template
+    :param file_name: str
+    :return: tuple of int
+    """
+    with open(file_name) as input:
+        return tuple(int(value) for value in next(csv.reader(input)))
+
+
+def _init_worker(template, found):
+    global _computer, _image, _found
+    _computer = IntCodeComputer(template)
+    _image = _computer.snapshot()
+    _found = found
+
+
+def search_noun(noun, target=TARGET):
+    """
+    Try every verb for one noun on the worker's computer
+    Each trial rewinds the computer to the snapshot of the template instead of building a new one
+    Gives up early once any worker has flagged the target as found
+    :param noun: int
+    :param target: int
+    :return: (noun, verb) or None
+    """
+
+    for verb in range(0, 100):
+        if _found.is_set():
+            return None
+        _computer.restore(_image)
+        _computer.program[1] = noun
+        _computer.program[2] = verb
+        _computer.process_program()
+        if _computer.program[0] == target:
+            _found.set()
+            return noun, verb
+    return None
+
+
+def search(template, target=TARGET, workers=None):
+    """
+    Spread the noun/verb grid over a process pool, one noun per task
+    :param template: tuple of int
+    :param target: int
+    :param workers: process count, defaults to the cpu count
+    :return: (noun, verb) or None
+    """
+
+    found = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(template, found)) as executor:
+        futures = [executor.submit(search_noun, noun, target) for noun in range(0, 100)]
+        for future in as_completed(futures):
+            result = future.result()
+            if result is not None:
+                for pending in futures:
+                    pending.cancel()
+                return result
+    return None
 
-            test_program = program
 
-
-            test_program[1] = str(noun)
-            test_program[2] = str(verb)
-            #print('test_program is {}'.format(test_program))
-            result = run_a_test(test_program)
-            if result[0] == 19690720:
-                print('noun and verb are {}, {}'.format(noun,verb))
+def run_main():
+    result = search(read_program("./scratch.txt"))
+    if result is not None:
+        print('noun and verb are {}, {}'.format(*result))
 
 
 def run_a_test(program):
@@ -82,4 +170,5 @@ def run_a_test(program):
     return computer.program
 
 
-run_main()
\ No newline at end of file
+if __name__ == '__main__':
+    run_main()
\ No newline at end of file
@@ -1,4 +1,5 @@
-import re
+from array import array
+from bisect import bisect_left, insort
 
 
 class Line:
@@ -27,117 +28,290 @@ class Line:
             self.x += 1
             self.board.store_step(self.x, self.y)
 
+    def follow(self, commands):
+        """
+        Walk every command of a parsed wire
+        :param commands: array from parse_wire()
+        :return:
+        """
+        # same order as the direction codes in DIRECTION_CODES
+        moves = (self.move_up, self.move_down, self.move_left, self.move_right)
+        for i in range(0, len(commands), 2):
+            moves[commands[i]](commands[i + 1])
+
+
+# coordinates are packed into one int as (x + BIAS) << 32 | (y + BIAS)
+BIAS = 1 << 31
+
+
+def pack(x, y):
+    return (x + BIAS) << 32 | (y + BIAS)
+
+
+def unpack(key):
+    return (key >> 32) - BIAS, (key & 0xFFFFFFFF) - BIAS
+
 
 class Board:
     def __init__(self):
-        self.points = []
+        # packed coordinate -> steps taken when the wire first got there
+        self.points = {}
+        self.steps = 0
 
     def store_step(self, x, y):
         """
         Stores a step on the board given x, and y
+        Only the first visit of a point is kept
         :param x: int
         :param y: int
         :return:
         """
-        self.points.append([x, y])
+        self.steps += 1
+        self.points.setdefault(pack(x, y), self.steps)
+
+    @classmethod
+    def from_commands(cls, commands):
+        """
+        Build a board by walking a wire
+        :param commands: array from parse_wire()
+        :return: Board
+        """
+        board = cls()
+        Line(board).follow(commands)
+        return board
 
 
 def detect_collision(board1, board2):
     """
-    Given two boards, find duplicate point sets
+    Given two boards, find the points both wires visit
     :param board1:
     :param board2:
-    :return:
+    :return: dictionary of (x, y) -> (manhattan distance, combined steps)
     """
-    for point in board1.points:
-        if point in board2.points:
-            print('collision found')
-            print(point)
-            print('distance')
-            print(calculate_fewest_combined_steps(board1.points, board2.points, point))
+    collisions = {}
+    for key in board1.points.keys() & board2.points.keys():
+        x, y = unpack(key)
+        collisions[(x, y)] = (abs(x) + abs(y), calculate_fewest_combined_steps(board1, board2, key))
+    return collisions
 
 
-DIRECTIONS = {
-    "U": "move_up",
-    "D": "move_down",
-    "L": "move_left",
-    "R": "move_right"
+# direction letter -> code stored in a parsed wire
+DIRECTION_CODES = {
+    "U": 0,
+    "D": 1,
+    "L": 2,
+    "R": 3
 }
 
 
-def read_input_file():
-    with open('./input.txt') as file:
-        return file.read()
+def calculate_fewest_combined_steps(board1, board2, key):
+    """
+    Steps both wires took to first reach the packed point 'key'
+    :param board1:
+    :param board2:
+    :param key: packed coordinate, see pack()
+    :return: int
+    """
+    return board1.points[key] + board2.points[key]
+
+
+def parse_wire(wire):
+    """
+    Parse a wire's description in one pass into a flat array of direction code, step count pairs
+    :param wire: like 'R8,U5,L5,D3'
+    :return: array('q') like [3, 8, 0, 5, 2, 5, 1, 3]
+    """
+    commands = array('q')
+    for token in wire.split(','):
+        commands.append(DIRECTION_CODES[token[0]])
+        commands.append(int(token[1:]))
+    return commands
+
+
+def read_wires(file_name='./input.txt'):
+    """
+    Stream the wires in a file one line at a time
+    :param file_name: str
+    :return: generator of arrays from parse_wire(), one per wire
+    """
+    with open(file_name) as file:
+        for line in file:
+            if line.strip():
+                yield parse_wire(line.strip())
+
+
+# unit step per direction code
+OFFSETS = (
+    (0, 1),
+    (0, -1),
+    (-1, 0),
+    (1, 0)
+)
+
+# sweep event order at the same x: horizontals open before verticals are checked, and close after
+OPEN, CHECK, CLOSE = 0, 1, 2
+
+
+def wire_segments(commands):
+    """
+    Turn a wire into axis aligned segments, never visiting the unit steps in between
+    :param commands: array from parse_wire()
+    :return: list of (x1, y1, x2, y2, steps taken to reach x1, y1)
+    """
+
+    segments = []
+    x = y = steps = 0
+    for i in range(0, len(commands), 2):
+        dx, dy = OFFSETS[commands[i]]
+        length = commands[i + 1]
+        segments.append((x, y, x + dx * length, y + dy * length, steps))
+        x += dx * length
+        y += dy * length
+        steps += length
+    return segments
+
+
+def steps_to(segment, x, y):
+    """
+    Steps a wire has taken when it reaches x, y along one of its segments
+    :param segment: from wire_segments()
+    :return: int
+    """
+    return segment[4] + abs(x - segment[0]) + abs(y - segment[1])
 
 
-def get_method(instruction):
+def crossing_distance(crossing):
+    """
+    Manhattan distance from the origin to the closest point of a crossing
+    Along an overlap only one coordinate changes, its smallest absolute value is 0 when the overlap runs over the
+    axis and otherwise sits at one of the ends
+    :param crossing: from find_all_crossings()
+    :return: int
     """
+    x1, y1, x2, y2 = crossing[:4]
+    closest_x = 0 if x1 <= 0 <= x2 else min(abs(x1), abs(x2))
+    closest_y = 0 if y1 <= 0 <= y2 else min(abs(y1), abs(y2))
+    return closest_x + closest_y
+
 
-    :param instruction: is like R991 or D123 or L34 or U2
-    :return:
+def crossing_steps(crossing):
     """
-    direction = re.findall('^[A-Z]', instruction)[0]
-    step_count = re.findall('[0-9]+', instruction)[0]
-    the_method = f".{DIRECTIONS[direction]}({step_count})"
-    return the_method
+    Fewest combined steps to any point of a crossing
+    Each wire's steps go up or down by one per unit along an overlap, so their sum is smallest at one of the ends
+    :param crossing: from find_all_crossings()
+    :return: int
+    """
+    return min(crossing[4], crossing[5])
+
 
-def calculate_fewest_combined_steps(set1, set2, point_set):
+def find_all_crossings(wires):
     """
-    Calculates steps from 'point_set' back to origin + 1
-    for both set1 and set2
-    :param set1:
-    :param set2:
-    :param point_set:
-    :return:
+    Sweep a vertical line from left to right over the segments of every wire at once
+    Horizontal segments of all wires share one list sorted by y while the sweep line is over them, each vertical
+    segment then only looks at the horizontals of other wires within its y range, so k wires take one sweep
+    instead of a sweep per pair
+    Wires running on top of each other cross at every point they share, those overlaps are found when a horizontal
+    opens on the same y as another one, or when verticals meet on the same x, and are reported as one interval
+    rather than point by point
+    :param wires: list of segment lists from wire_segments()
+    :return: dictionary of (wire index, other wire index) -> list of
+        (x1, y1, x2, y2, combined steps at x1, y1, combined steps at x2, y2), x1 <= x2 and y1 <= y2,
+        a crossing at a single point has both ends equal. The lower index comes first and the origin is left out.
+        A point shared by several segments of the same wire shows up once per pair of segments,
+        see crossing_distance() and crossing_steps()
     """
-    # set1 = [[1, 0], [2, 0], [3, 0], [4, 0], [5, 0], [6, 0], [7, 0], [8, 0], [8, 1], [8, 2], [8, 3], [8, 4], [8, 5], [7, 5], [6, 5], [5, 5], [4, 5], [3, 5], [3, 4], [3, 3], [3, 2]]
-    # set2 = [[0, 1], [0, 2], [0, 3], [0, 4], [0, 5], [0, 6], [0, 7], [1, 7], [2, 7], [3, 7], [4, 7], [5, 7], [6, 7], [6, 6], [6, 5], [6, 4], [6, 3], [5, 3], [4, 3], [3, 3], [2, 3]]
-    # point_set = [3, 3]
 
-    i = 1
-    for set in set1:
-        if set == point_set:
-            break
-        i += 1
-    set1_distance = i
+    events = []
+    for wire, segments in enumerate(wires):
+        for segment in segments:
+            x1, y1, x2, y2, steps = segment
+            if y1 == y2:
+                events.append((min(x1, x2), OPEN, wire, segment))
+                events.append((max(x1, x2), CLOSE, wire, segment))
+            else:
+                events.append((x1, CHECK, wire, segment))
+    events.sort(key=lambda event: (event[0], event[1]))
 
-    j = 1
-    for set in set2:
-        if set == point_set:
-            break
-        j += 1
-    set2_distance = j
+    # (y, wire, segment) for every horizontal the sweep line is currently over
+    active = []
+    # (low y, high y, wire, segment) for the verticals seen so far on the current x
+    verticals = []
+    verticals_x = None
+    crossings = {}
 
-    return set1_distance + set2_distance
+    def record(x1, y1, x2, y2, wire, segment, other, other_segment):
+        if wire == other:
+            return
+        if x1 <= 0 <= x2 and y1 <= 0 <= y2:
+            # cut the origin out of the overlap
+            dx, dy = (1, 0) if y1 == y2 else (0, 1)
+            if (x1, y1) != (0, 0):
+                record(x1, y1, -dx, -dy, wire, segment, other, other_segment)
+            if (x2, y2) != (0, 0):
+                record(dx, dy, x2, y2, wire, segment, other, other_segment)
+            return
+        crossings.setdefault((min(wire, other), max(wire, other)), []).append(
+            (x1, y1, x2, y2,
+             steps_to(segment, x1, y1) + steps_to(other_segment, x1, y1),
+             steps_to(segment, x2, y2) + steps_to(other_segment, x2, y2)))
 
+    for x, kind, wire, segment in events:
+        if kind == OPEN:
+            y = segment[1]
+            end = max(segment[0], segment[2])
+            i = bisect_left(active, (y,))
+            while i < len(active) and active[i][0] == y:
+                other, other_segment = active[i][1:]
+                i += 1
+                record(x, y, min(end, max(other_segment[0], other_segment[2])), y,
+                       wire, segment, other, other_segment)
+            insort(active, (y, wire, segment))
+        elif kind == CLOSE:
+            del active[bisect_left(active, (segment[1], wire, segment))]
+        else:
+            x1, y1, x2, y2, vertical_steps = segment
+            low, high = min(y1, y2), max(y1, y2)
 
+            i = bisect_left(active, (low,))
+            while i < len(active) and active[i][0] <= high:
+                y, other, other_segment = active[i]
+                i += 1
+                record(x, y, x, y, wire, segment, other, other_segment)
 
-def main():
+            if x != verticals_x:
+                verticals = []
+                verticals_x = x
+            for other_low, other_high, other, other_segment in verticals:
+                if max(low, other_low) <= min(high, other_high):
+                    record(x, max(low, other_low), x, min(high, other_high), wire, segment, other, other_segment)
+            verticals.append((low, high, wire, segment))
+
+    return crossings
+
+
+def find_crossings(segments1, segments2):
     """
-    Testing Ideas
+    Crossings between two wires, see find_all_crossings()
+    :param segments1: from wire_segments()
+    :param segments2: from wire_segments()
+    :return: list of crossings, the origin is left out
     """
-    lines = read_input_file().splitlines()
-    l1_input = lines[0].split(',')
-    l2_input = lines[1].split(',')
+    return find_all_crossings([segments1, segments2]).get((0, 1), [])
 
-    line1_board = Board()
-    line1 = Line(line1_board)
-    for step in l1_input:
-        method = get_method(step)
-        eval(f"line1{method}")
 
-    line2_board = Board()
-    line2 = Line(line2_board)
-    for step in l2_input:
-        method = get_method(step)
-        eval(f"line2{method}")
+def main():
+    """
+    Closest crossing and fewest combined steps to a crossing
+    """
+    wire1, wire2 = read_wires()
+    crossings = find_crossings(wire_segments(wire1), wire_segments(wire2))
 
-    print(line1_board.points)
-    print(line2_board.points)
-    detect_collision(line1_board, line2_board)
+    print(f"closest crossing distance {min(crossing_distance(crossing) for crossing in crossings)}")
+    print(f"fewest combined steps {min(crossing_steps(crossing) for crossing in crossings)}")
 
 
-main()
+if __name__ == '__main__':
+    main()
 
 """
 ...........
@@ -19,6 +19,10 @@ How many different passwords within the range given in your puzzle input meet th
 Your puzzle input is 271973-785961.
 
 """
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations_with_replacement
 
 # NB: There's probably several solutions within a boundary of 0 + 100,000
 #   that are multiplied for every 100,000 under 785,961
@@ -28,6 +32,8 @@ Your puzzle input is 271973-785961.
 
 # NB: Update, just used an algorithm, a stack and recursion to check digits
 
+# NB: Update, only non decreasing numbers can pass so count_passwords enumerates those instead of the whole range
+
 THE_RANGE = range(271973, 785961+1)
 
 
@@ -138,14 +144,194 @@ def password_filter(number):
         return True
 
 
-def main():
-    list = []
-    for number in THE_RANGE:
-        if password_filter(number):
-            print(f"passed check {number}")
-            list.append(number)
+def non_decreasing_digits(length):
+    """
+    Every digit sequence of the given length that never decreases, without a leading zero
+    There are only C(length + 8, 8) of them for lengths above 1, 3003 for six digits
+    :param length: int
+    :return: generator of digit tuples
+    """
+    # a zero can only ever be the first digit of a non decreasing number
+    digits = range(10) if length == 1 else range(1, 10)
+    return combinations_with_replacement(digits, length)
+
+
+def count_passwords(low, high, exact_pair=False):
+    """
+    Counts the passwords between low and high (inclusive) by only looking at non decreasing numbers
+    Since the digits never decrease, equal digits are always next to each other and the run lengths are just
+    the digit counts
+    :param low: int
+    :param high: int
+    :param exact_pair: require a run of exactly two, the day 4.b rule, instead of at least two
+    :return: int
+    """
+
+    count = 0
+    for length in range(len(str(low)), len(str(high)) + 1):
+        for digits in non_decreasing_digits(length):
+            number = 0
+            for digit in digits:
+                number = number * 10 + digit
+            if not low <= number <= high:
+                continue
+
+            runs = Counter(digits).values()
+            if (2 in runs) if exact_pair else (max(runs) >= 2):
+                count += 1
+    return count
+
+
+class DigitBlock:
+    """
+    The digits of a run of consecutive numbers of the same length, laid out as a matrix with one row per number
+    and one byte per digit. A column is a strided slice of the matrix, so rules look at a digit position for every
+    number in the block at once
+    """
+
+    def __init__(self, start, stop):
+        """
+        :param start: first number
+        :param stop: one past the last number, all numbers in between need the same digit count
+        """
+        self.start = start
+        self.width = len(str(start))
+        self.size = stop - start
+        self.matrix = "".join(map(str, range(start, stop))).encode()
+        self.columns = [self.matrix[p::self.width] for p in range(self.width)]
+
+    def numbers(self, rows):
+        return [self.start + row for row in rows]
+
+
+def non_decreasing(block, rows):
+    """
+    Going from left to right, the digits never decrease
+    """
+    columns = block.columns
+    for p in range(block.width - 1):
+        left, right = columns[p], columns[p + 1]
+        rows = [row for row in rows if left[row] <= right[row]]
+        if not rows:
+            break
+    return rows
+
+
+def has_pair(block, rows):
+    """
+    Two adjacent digits are the same
+    """
+    columns = block.columns
+    paired = set()
+    for p in range(block.width - 1):
+        left, right = columns[p], columns[p + 1]
+        paired.update(row for row in rows if left[row] == right[row])
+    return [row for row in rows if row in paired]
+
+
+def exact_pair(block, rows):
+    """
+    Two adjacent digits are the same and not part of a larger group, the day 4.b rule
+    """
+    columns = block.columns
+    width = block.width
+    paired = set()
+    for p in range(width - 1):
+        left, right = columns[p], columns[p + 1]
+        before = columns[p - 1] if p > 0 else None
+        after = columns[p + 2] if p + 2 < width else None
+        paired.update(row for row in rows if left[row] == right[row]
+                      and (before is None or before[row] != left[row])
+                      and (after is None or after[row] != right[row]))
+    return [row for row in rows if row in paired]
+
+
+class RulePipeline:
+    """
+    Rules applied one after the other to a block of candidates
+    A rule takes a DigitBlock and the rows still passing and returns the rows it lets through, so every rule only
+    looks at what the rules before it kept and a block that nothing survives stops early
+    """
+
+    def __init__(self, *rules):
+        self.rules = rules
+
+    def then(self, rule):
+        return RulePipeline(*self.rules, rule)
+
+    def evaluate(self, block):
+        rows = range(block.size)
+        for rule in self.rules:
+            rows = rule(block, rows)
+            if not rows:
+                return []
+        return list(rows)
+
+    def blocks(self, low, high, chunk_size=100000):
+        """
+        Split low to high (inclusive) into blocks of at most chunk_size numbers, never spanning a change in digit count
+        :return: generator of DigitBlock
+        """
+        start = low
+        while start <= high:
+            stop = min(start + chunk_size, high + 1, 10 ** len(str(start)))
+            yield DigitBlock(start, stop)
+            start = stop
+
+    def matches(self, low, high, chunk_size=100000):
+        for block in self.blocks(low, high, chunk_size):
+            yield from block.numbers(self.evaluate(block))
+
+    def count(self, low, high, chunk_size=100000):
+        return sum(len(self.evaluate(block)) for block in self.blocks(low, high, chunk_size))
+
+
+PART_ONE = RulePipeline(non_decreasing, has_pair)
+PART_TWO = RulePipeline(non_decreasing, exact_pair)
+
 
-    print(len(list))
+def validate_chunk(pipeline, low, high, collect_matches=False):
+    """
+    Run a pipeline over one chunk, this is what each worker process does
+    :return: (low, high, count, matches or None)
+    """
+    if collect_matches:
+        matches = list(pipeline.matches(low, high))
+        return low, high, len(matches), matches
+    return low, high, pipeline.count(low, high), None
+
+
+def validate_range(low, high, pipeline=PART_ONE, chunk_size=1000000, workers=None, collect_matches=False):
+    """
+    Split low to high (inclusive) into chunks and validate them on a process pool
+    :param pipeline: RulePipeline
+    :param chunk_size: numbers per chunk handed to a worker
+    :param workers: process count, defaults to the cpu count
+    :param collect_matches: also return the passing numbers
+    :return: generator of (low, high, count, matches or None) in the order the chunks finish
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(validate_chunk, pipeline, start, min(start + chunk_size - 1, high), collect_matches)
+                   for start in range(low, high + 1, chunk_size)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def count_range(low, high, pipeline=PART_ONE, chunk_size=1000000, workers=None):
+    """
+    Count the passing numbers between low and high on a process pool
+    :return: (count, candidates per second)
+    """
+    started = time.perf_counter()
+    count = sum(batch[2] for batch in validate_range(low, high, pipeline, chunk_size, workers))
+    elapsed = time.perf_counter() - started
+    return count, (high - low + 1) / elapsed
+
+
+def main():
+    print(count_passwords(THE_RANGE.start, THE_RANGE.stop - 1))
+    print(count_passwords(THE_RANGE.start, THE_RANGE.stop - 1, exact_pair=True))
 
 
-main()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Instructions per second for the IntCodeComputer
+
+'before' is the old interpreter that formatted every instruction into a string and ran it through eval
+'after' is the dispatch table engine in main2.py, 'jit' is the same computer running compiled basic blocks
+
+The program is run several times on the same computer, restoring its memory in between, which is how the
+search drivers use it and what lets the jit reuse its compiled blocks
+
+Usage: python benchmark.py [instruction_count] [runs]
+"""
+import sys
+import time
+
+from main2 import IntCodeComputer
+
+
+def make_program(instruction_count):
+    """
+    Build a straight line program of alternating add and multiply instructions followed by a halt
+    Every instruction reads the scratch cells that sit after the halt so values never grow
+    :param instruction_count: int
+    :return: int[]
+    """
+
+    halt_position = instruction_count * 4
+    one = halt_position + 1
+    result = halt_position + 2
+
+    program = []
+    for i in range(instruction_count):
+        program.extend([1 if i % 2 == 0 else 2, one, one, result])
+    program.extend([99, 1, 0])
+    return program
+
+
+def legacy_process_program(program):
+    """
+    The eval driven loop the computer used before the dispatch table
+    :param program: str[]
+    :return: void
+    """
+
+    operators = {"1": "+", "2": "*"}
+    position = 0
+    while program[position] in operators:
+        first_operand = int(program[position + 1])
+        second_operand = int(program[position + 2])
+        result_index = int(program[position + 3])
+        program[result_index] = str(eval("{} {} {}".format(program[first_operand],
+                                                          operators[program[position]],
+                                                          program[second_operand])))
+        position += 4
+
+
+def measure(run, instruction_count):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    return instruction_count / elapsed
+
+
+def run_legacy(program, runs):
+    for _ in range(runs):
+        legacy_process_program([str(value) for value in program])
+
+
+def run_computer(program, runs, engine):
+    computer = IntCodeComputer(program, engine=engine)
+    image = computer.snapshot()
+    for _ in range(runs):
+        computer.restore(image)
+        computer.process_program()
+
+
+def main():
+    instruction_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    program = make_program(instruction_count)
+    executed = instruction_count * runs
+
+    before = measure(lambda: run_legacy(program, runs), executed)
+    after = measure(lambda: run_computer(program, runs, "interpreter"), executed)
+    jit = measure(lambda: run_computer(program, runs, "jit"), executed)
+
+    print(f"instructions: {instruction_count} x {runs} runs")
+    print(f"before: {before:,.0f} instructions/s")
+    print(f"after:  {after:,.0f} instructions/s ({after / before:.1f}x)")
+    print(f"jit:    {jit:,.0f} instructions/s ({jit / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
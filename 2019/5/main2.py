@@ -1,4 +1,131 @@
-import csv
+import asyncio
+import mmap
+import os
+import re
+import sys
+import time
+from array import array
+from collections import Counter, deque
+from collections.abc import Sequence
+
+POSITION_MODE = 0
+IMMEDIATE_MODE = 1
+
+INTEGER = re.compile(rb'-?[0-9]+')
+
+READ = "read"
+WRITE = "write"
+
+# opcode -> (handler, kind of each parameter)
+INSTRUCTIONS = {
+    1: ("do_code_01", (READ, READ, WRITE)),
+    2: ("do_code_02", (READ, READ, WRITE)),
+    3: ("do_code_03", (WRITE,)),
+    4: ("do_code_04", (READ,)),
+    99: ("do_code_99", ()),
+}
+
+# Source templates for the instructions the jit engine compiles into basic blocks
+# Opcodes 3 and 99 end a block and are left to the interpreter
+BLOCK_TEMPLATES = {
+    1: "m[{2}] = {0} + {1}",
+    2: "m[{2}] = {0} * {1}",
+    4: "write_output({0})",
+}
+
+# longest run of instructions compiled into one block, keeps compile time bounded on huge straight line programs
+MAX_BLOCK_LENGTH = 64
+
+ENGINES = ("interpreter", "jit")
+
+
+class InputNotReady(Exception):
+    """
+    Raised by opcode 3 when its input channel has nothing to read yet
+    The instruction pointer is left on the opcode 3 so the machine can carry on once input arrives
+    """
+
+
+def input_reader(source):
+    """
+    Turn an input source into a function that returns the next value
+    A list (or other sequence) is read by position, so values appended to it later, like another machine's
+    outputs, still get picked up. Other iterables are read through an iterator and are done once it runs out
+    :param source: None for the interactive prompt, an asyncio.Queue, a deque, a sequence or any iterable
+    :return: function
+    """
+
+    if source is None:
+        return lambda: input("Please provide an input")
+    if isinstance(source, asyncio.Queue):
+        return source.get_nowait
+    if isinstance(source, deque):
+        return source.popleft
+    if isinstance(source, Sequence) and not isinstance(source, (str, bytes)):
+        position = 0
+
+        def read_next():
+            nonlocal position
+            # IndexError until something new is appended
+            value = source[position]
+            position += 1
+            return value
+
+        return read_next
+    return iter(source).__next__
+
+
+def output_writer(sink):
+    """
+    Turn an output sink into a function that takes the next value
+    :param sink: an asyncio.Queue, a function, or anything with append like a list or deque
+    :return: function
+    """
+
+    if isinstance(sink, asyncio.Queue):
+        return sink.put_nowait
+    if callable(sink):
+        return sink
+    return sink.append
+
+
+class Profile:
+    """
+    Execution counts per opcode and per instruction address, and time spent per opcode
+    Hand one to IntCodeComputer(profile=...) to turn instrumentation on
+    """
+
+    def __init__(self):
+        self.opcode_counts = Counter()
+        self.address_counts = Counter()
+        # nanoseconds
+        self.opcode_time = Counter()
+
+    def record(self, opcode, address, elapsed):
+        self.opcode_counts[opcode] += 1
+        self.address_counts[address] += 1
+        self.opcode_time[opcode] += elapsed
+
+    def dump(self, top=10, file=sys.stdout):
+        """
+        Print a flat profile, opcodes by time spent and then the hottest addresses
+        :param top: how many addresses to list
+        :param file: where to print
+        :return: void
+        """
+
+        total_time = sum(self.opcode_time.values()) or 1
+        total_count = sum(self.opcode_counts.values()) or 1
+
+        print(f"{'% time':>7} {'total ms':>10} {'calls':>10} {'ns/call':>9}  opcode", file=file)
+        for opcode, elapsed in self.opcode_time.most_common():
+            calls = self.opcode_counts[opcode]
+            print(f"{100 * elapsed / total_time:7.2f} {elapsed / 1e6:10.3f} {calls:10d} {elapsed / calls:9.0f}"
+                  f"  {opcode:02d} {INSTRUCTIONS[opcode][0]}", file=file)
+
+        print(f"\n{'% calls':>7} {'calls':>10}  address", file=file)
+        for address, calls in self.address_counts.most_common(top):
+            print(f"{100 * calls / total_count:7.2f} {calls:10d}  {address}", file=file)
 
 
 class IntCodeComputer:
@@ -8,8 +135,41 @@ class IntCodeComputer:
 
     instruction_pointer = 0
 
-    def __init__(self, program):
-        self.program = program
+    def __init__(self, program, modes=None, inputs=None, outputs=None, profile=None, engine="interpreter"):
+        """
+        :param program: int[] or array('q') from load_program
+        :param modes: optional mode table from mode_table(), its instructions are bound up front
+        :param inputs: where opcode 3 reads from, see input_reader(), defaults to prompting on the terminal
+        :param outputs: where opcode 4 writes to, see output_writer(), defaults to a new list
+        :param profile: a Profile to record into, leave out to run without instrumentation
+        :param engine: "interpreter" or "jit", profiling always runs on the interpreter
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine}, expected one of {ENGINES}")
+
+        self.program = array('q', program) if isinstance(program, array) else \
+            array('q', (int(value) for value in program))
+        self.instruction_pointer = 0
+        self.halted = False
+        self.instructions_executed = 0
+        self.profile = profile
+        self.engine = engine
+        # instruction word -> (bound handler, dereference flags, width)
+        self.dispatch_table = {}
+        # block start -> (compiled function, instruction count, write targets, end address, code),
+        # or None where the interpreter has to take the instruction
+        self.blocks = {}
+        # address -> starts of the blocks whose code covers it
+        self.block_owners = {}
+
+        self.inputs = inputs
+        self.read_input = input_reader(inputs)
+        self.outputs = [] if outputs is None else outputs
+        self.write_output = output_writer(self.outputs)
+
+        if modes:
+            for address, decoded in modes.items():
+                self.decode(self.program[address], decoded)
 
     def do_code_01(self, first_addend, second_addend, output_location):
         """
@@ -41,141 +201,367 @@ class IntCodeComputer:
 
     def do_code_03(self, output_location):
         """
-        Takes a single integer as input and saves it to the position
+        Takes a single integer from the input channel and saves it to the position
         given by its only parameter
-        :param input: int
         :param output_location: int
         :return: void
         """
 
-        the_input = input("Please provide an input")
-        self.program[output_location] = the_input
+        try:
+            the_input = self.read_input()
+        except (IndexError, StopIteration, asyncio.QueueEmpty):
+            raise InputNotReady
+        self.program[output_location] = int(the_input)
 
-    def do_code_04(self, input):
+    def do_code_04(self, value):
         """
-        Outputs the value of its only parameter
-        :param input: int
+        Outputs the value of its only parameter to the output channel
+        :param value: int
         :return: int
         """
-        return self.program[input]
+        self.write_output(value)
+        return value
 
-    @staticmethod
-    def do_code_99():
+    def do_code_99(self):
         """
         Code 99 is halt
         :return:
         """
-        return
+        self.halted = True
 
-    def increment_instruction_pointer(self, step):
-        self.instruction_pointer += step
-        if self.instruction_pointer > len(self.program):
-            return
+    def snapshot(self):
+        """
+        Copy the memory image so the machine can be rewound later
+        :return: array('q')
+        """
+        return self.program[:]
 
-    def determine_instruction_width(self, starting_position, program):
+    def restore(self, image):
         """
-        At the beginning, start at 0, read the instruction in that position, increment the program counter
-        :param starting_position:
-        :param program:
-        :return:
+        Rewind the machine to a snapshot, the memory comes back in a single buffer copy
+        Decoded instruction words stay cached since they don't depend on memory, compiled blocks stay cached as long
+        as the code they were compiled from is unchanged
+        :param image: array('q') from snapshot()
+        :return: void
+        """
+        self.program[:] = image
+        self.instruction_pointer = 0
+        self.halted = False
+
+        for start, block in list(self.blocks.items()):
+            if block is None:
+                # left to the interpreter because of the word at start, which may compile now
+                del self.blocks[start]
+            elif self.program[start:block[3]] != block[4]:
+                self.invalidate_block(start)
+
+    def decode(self, word, decoded=None):
+        """
+        Bind an instruction word to its handler and store it in the dispatch table
+        so each distinct word is only decoded once
+        :param word: int
+        :param decoded: (opcode, modes) from a mode table, decoded from the word when missing
+        :return: (bound handler, which parameters to read from memory, instruction width)
         """
 
-        if starting_position >= len(self.program) - 1:
-            return
-        else:
-            op = program[starting_position]
-            # explode the first element into a 5 digit string
-            instruction_set = str(f"{int(op):05d}")
+        opcode, modes = decoded or decode_word(word)
+        handler_name, parameters = INSTRUCTIONS[opcode]
 
-            if instruction_set[-1] == '1' or instruction_set[-1] == '2':
-                width = 4
-            elif instruction_set[-1] == '3':
-                width = 2
+        # writes always target an address, only position mode reads go through memory
+        dereference = tuple(kind == READ and mode == POSITION_MODE for kind, mode in zip(parameters, modes))
 
-            return width
+        entry = (getattr(self, handler_name), dereference, len(parameters) + 1)
+        self.dispatch_table[word] = entry
+        return entry
 
-    def parse_instruction(self, block):
+    def step(self):
+        """
+        Execute the single instruction at the instruction pointer
+        :return: void
         """
-        A block is variable length
-        the first element in the block is also variable; it can contain up to 5 digits
-        Consider this instruction:
-            ABCDE
-             1002
 
-        Digits D and E from right to left are '02', a multiply instruction
-        Digit  C is 0 and indicates the first parameter is in position mode
-        Digit  B is 1 and indicates the second parameter is in immediate mode
-        :param block: int[]
-        :return: dictionary
+        memory = self.program
+        pointer = self.instruction_pointer
+        word = memory[pointer]
+        handler, dereference, width = self.dispatch_table.get(word) or self.decode(word)
+        handler(*[memory[value] if position else value
+                  for position, value in zip(dereference, memory[pointer + 1:pointer + width])])
+        self.instruction_pointer = pointer + width
+        self.instructions_executed += 1
+
+    def process_program(self, limit=None):
+        """
+        Run until the program halts or runs off the end of memory
+        This is step() unrolled into one loop so the hot path avoids a method call per instruction
+        :param limit: stop after this many instructions, used to run the machine in slices
+        :return: number of instructions executed
         """
 
-        # explode the first element into a 5 digit string
-        instruction_set = str(f"{int(block[0]):05d}")
+        if self.profile is not None:
+            return self.process_program_profiled(limit)
+        if self.engine == "jit":
+            return self.process_program_jit(limit)
+
+        memory = self.program
+        dispatch_table = self.dispatch_table
+        decode = self.decode
+        pointer = self.instruction_pointer
+        executed = 0
+
+        try:
+            while not self.halted and pointer < len(memory) and executed != limit:
+                word = memory[pointer]
+                handler, dereference, width = dispatch_table.get(word) or decode(word)
+                handler(*[memory[value] if position else value
+                          for position, value in zip(dereference, memory[pointer + 1:pointer + width])])
+                pointer += width
+                self.instruction_pointer = pointer
+                executed += 1
+        finally:
+            self.instructions_executed += executed
+
+        return executed
+
+    def process_program_profiled(self, limit=None):
+        """
+        process_program() with every instruction counted and timed into self.profile
+        Kept as a separate loop so an unprofiled run doesn't pay for any of it
+        :param limit: stop after this many instructions
+        :return: number of instructions executed
+        """
 
-        the_operation = str(f"{instruction_set[-2]}{instruction_set[-1]}")
+        memory = self.program
+        dispatch_table = self.dispatch_table
+        decode = self.decode
+        record = self.profile.record
+        clock = time.perf_counter_ns
+        pointer = self.instruction_pointer
+        executed = 0
+
+        try:
+            while not self.halted and pointer < len(memory) and executed != limit:
+                started = clock()
+                word = memory[pointer]
+                handler, dereference, width = dispatch_table.get(word) or decode(word)
+                handler(*[memory[value] if position else value
+                          for position, value in zip(dereference, memory[pointer + 1:pointer + width])])
+                record(word % 100, pointer, clock() - started)
+                pointer += width
+                self.instruction_pointer = pointer
+                executed += 1
+        finally:
+            self.instructions_executed += executed
+
+        return executed
+
+    def provide_input(self, value):
+        """
+        Finish the opcode 3 the machine stopped on with a value that arrived some other way,
+        like from awaiting an asyncio queue
+        :param value: int
+        :return: void
+        """
 
-        the_method = f"do_code_{the_operation}"
+        pointer = self.instruction_pointer
+        self.program[self.program[pointer + 1]] = int(value)
+        self.instruction_pointer = pointer + 2
+        self.instructions_executed += 1
+        if self.profile is not None:
+            self.profile.record(3, pointer, 0)
+        self.invalidate(self.program[pointer + 1])
 
-        # Read parameter modes
-        first_parameter_mode = instruction_set[-3]
-        second_parameter_mode = instruction_set[-4]
-        third_parameter_mode = instruction_set[-5]
+    def compile_block(self, start):
+        """
+        Compile the straight line run of instructions at start into one Python function
+        The run ends before a halt, an input, anything that doesn't decode, or an instruction that an earlier one
+        in the same run writes over. Parameters are read from memory now and baked into the source, so the block
+        has to be thrown away when its code changes, see invalidate()
+        :param start: int
+        :return: the cached block, or None when the instruction at start is left to the interpreter
+        """
 
-        # need to know how many arguments to read and in which mode
-        # look at the instruction, look at the modes and gather the values
+        memory = self.program
+        lines = []
+        writes = []
+        written = set()
+        address = start
+
+        while address < len(memory) and len(lines) < MAX_BLOCK_LENGTH:
+            word = memory[address]
+            if word < 0 or word % 100 not in BLOCK_TEMPLATES:
+                break
+            opcode, modes = decode_word(word)
+            width = len(modes) + 1
+            if address + width > len(memory) or not written.isdisjoint(range(address, address + width)):
+                break
+
+            operands = []
+            for kind, mode, value in zip(INSTRUCTIONS[opcode][1], modes, memory[address + 1:address + width]):
+                if kind == WRITE:
+                    writes.append(value)
+                    written.add(value)
+                    operands.append(value)
+                elif mode == POSITION_MODE:
+                    operands.append(f"m[{value}]")
+                else:
+                    operands.append(value)
+
+            lines.append("    " + BLOCK_TEMPLATES[opcode].format(*operands))
+            address += width
+
+        if not lines:
+            self.blocks[start] = None
+            return None
+
+        namespace = {}
+        exec(compile("def block(m, write_output):\n" + "\n".join(lines), f"<intcode block {start}>", "exec"),
+             namespace)
+        block = (namespace["block"], len(lines), tuple(writes), address, memory[start:address])
+
+        self.blocks[start] = block
+        for covered in range(start, address):
+            self.block_owners.setdefault(covered, set()).add(start)
+        return block
+
+    def invalidate(self, address):
+        """
+        Drop every compiled block whose code covers address, call after writing to memory outside the engine
+        An address that was left to the interpreter is forgotten too, the new word there may compile
+        :param address: int
+        :return: void
+        """
+        if address in self.blocks and self.blocks[address] is None:
+            del self.blocks[address]
+        for start in self.block_owners.pop(address, ()):
+            self.invalidate_block(start)
+
+    def invalidate_block(self, start):
+        block = self.blocks.pop(start, None)
+        if block is None:
+            return
+        for covered in range(start, block[3]):
+            owners = self.block_owners.get(covered)
+            if owners:
+                owners.discard(start)
 
-        if the_operation == '01' or the_operation == '02':
-            # three parameters
-            if first_parameter_mode == '1':
-                first_parameter = int(block[1])
-            else:
-                first_parameter = self.program[int(block[1])]
-            if second_parameter_mode == '1':
-                second_parameter = int(block[2])
-            else:
-                second_parameter = self.program[int(block[2])]
+    def process_program_jit(self, limit=None):
+        """
+        Run the program as compiled basic blocks, see compile_block()
+        Instructions that can't be compiled are run one at a time with step()
+        :param limit: stop once at least this many instructions ran, blocks are never split
+        :return: number of instructions executed
+        """
 
-            if third_parameter_mode == '1':
-                third_parameter = int(block[3])
+        memory = self.program
+        blocks = self.blocks
+        block_owners = self.block_owners
+        write_output = self.write_output
+        pointer = self.instruction_pointer
+        executed = 0
+
+        while not self.halted and pointer < len(memory) and (limit is None or executed < limit):
+            block = blocks[pointer] if pointer in blocks else self.compile_block(pointer)
+
+            if block is None:
+                kinds = INSTRUCTIONS[memory[pointer] % 100][1] if memory[pointer] % 100 in INSTRUCTIONS else ()
+                targets = [memory[pointer + offset] for offset, kind in enumerate(kinds, 1) if kind == WRITE]
+                self.step()
+                for target in targets:
+                    self.invalidate(target)
+                executed += 1
             else:
-                third_parameter = int(block[3])
-                #third_parameter = self.program[int(block[3])]
+                function, length, writes, end, code = block
+                function(memory, write_output)
+                self.instruction_pointer = end
+                self.instructions_executed += length
+                executed += length
+                for target in writes:
+                    if target in block_owners or target in blocks:
+                        self.invalidate(target)
 
-            return f"self.{the_method}({first_parameter}, {second_parameter}, {third_parameter})", 4
+            pointer = self.instruction_pointer
 
-        elif the_operation == '03':
-            if first_parameter_mode == '1':
-                first_parameter = self.program[int(block[1])]
-            else:
-                first_parameter = int(block[1])
+        return executed
+
+    @property
+    def finished(self):
+        return self.halted or self.instruction_pointer >= len(self.program)
+
+
+def decode_word(word):
+    """
+    A word is the first element of a block, it can contain up to 5 digits
+    Consider this instruction:
+        ABCDE
+         1002
+
+    Digits D and E from right to left are '02', a multiply instruction
+    Digit  C is 0 and indicates the first parameter is in position mode
+    Digit  B is 1 and indicates the second parameter is in immediate mode
+    :param word: int
+    :return: (opcode, mode of each parameter)
+    """
+
+    opcode = word % 100
+    parameter_count = len(INSTRUCTIONS[opcode][1])
+    modes = word // 100
 
-            return f"self.{the_method}({first_parameter})", 2
-        else:
-            return f"self.{the_method}()"
+    parameter_modes = []
+    for _ in range(parameter_count):
+        parameter_modes.append(modes % 10)
+        modes //= 10
 
-    def process_program(self):
-        while True:
-            width = self.determine_instruction_width(self.instruction_pointer, self.program)
-            if width is None:
-                return
-            the_block = self.program[self.instruction_pointer:self.instruction_pointer+width]
-            call = self.parse_instruction(the_block)
-            eval(call[0])
-            self.increment_instruction_pointer(call[1])
+    return opcode, tuple(parameter_modes)
 
 
-def read_csv(file_name):
-    with open(file_name) as f:
-        return list(csv.reader(f))
+def mode_table(memory):
+    """
+    Precompute the addressing modes for every address that holds an instruction
+    Sweeps the program from address 0 one instruction at a time, a cell that doesn't decode is treated as data
+    and the sweep moves on to the next cell
+    :param memory: array('q')
+    :return: dictionary of address -> (opcode, modes)
+    """
+
+    table = {}
+    address = 0
+    while address < len(memory):
+        word = memory[address]
+        if word < 0 or word % 100 not in INSTRUCTIONS:
+            address += 1
+            continue
+        opcode, modes = table[address] = decode_word(word)
+        address += len(modes) + 1
+    return table
+
+
+def load_program(file_name, memory_map=False):
+    """
+    Read a comma separated program straight into integer memory
+    With memory_map the file is scanned through mmap rather than read into a string first, for very large programs
+    :param file_name: str
+    :param memory_map: bool
+    :return: array('q')
+    """
+
+    with open(file_name, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return array('q')
+        if memory_map:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return array('q', (int(value.group()) for value in INTEGER.finditer(data)))
+        return array('q', (int(value) for value in f.read().split(b',')))
 
 
 def main():
     # Get the program
-    program = read_csv('./input.txt')[0]
-    print(f"starting program {program}")
-    computer = IntCodeComputer(program)
+    program = load_program('./input.txt')
+    print(f"starting program {program.tolist()}")
+    # the diagnostic asks for the ID of the system to test, 1 is the ship's air conditioner unit
+    computer = IntCodeComputer(program, modes=mode_table(program), inputs=[1])
     computer.process_program()
-    print(computer.program)
+    print(computer.outputs)
 
 
-main()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
\ No newline at end of file
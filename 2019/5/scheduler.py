@@ -0,0 +1,141 @@
+"""
+Runs many IntCodeComputers cooperatively on one asyncio event loop
+
+Each machine is an asyncio task that executes its program in slices and yields back to the loop between slices.
+A machine that waits on input yields until a value shows up on its input queue, so networked or daisy chained
+machines can share one thread.
+When every machine that hasn't halted is waiting on input nothing can ever move again, run() raises Deadlock
+instead of waiting forever.
+"""
+import asyncio
+import time
+
+from main2 import IntCodeComputer, InputNotReady
+
+
+class Deadlock(Exception):
+    """
+    Raised when every machine still running is waiting on input that no other machine can produce
+    """
+
+
+class Scheduler:
+    """
+    Keeps track of a set of named machines and how much work each of them did
+    """
+
+    def __init__(self, slice_size=1000):
+        """
+        :param slice_size: instructions a machine runs before giving the other machines a turn
+        """
+        self.slice_size = slice_size
+        self.machines = {}
+        self.wait_time = {}
+        # machines awaiting their asyncio.Queue input
+        self.awaiting = set()
+        # machines polling a non-queue input that came up empty since any machine last made progress
+        self.stuck = set()
+
+    def add(self, name, computer):
+        self.machines[name] = computer
+        self.wait_time[name] = 0.0
+        return computer
+
+    async def run_machine(self, name):
+        computer = self.machines[name]
+
+        while not computer.finished:
+            executed = computer.instructions_executed
+            try:
+                computer.process_program(limit=self.slice_size)
+                waiting = False
+            except InputNotReady:
+                waiting = True
+
+            if computer.instructions_executed != executed:
+                # anything a machine did may have fed a polling machine, they all have to look again
+                self.stuck.clear()
+
+            if not waiting:
+                await asyncio.sleep(0)
+                continue
+
+            started = time.perf_counter()
+            if isinstance(computer.inputs, asyncio.Queue):
+                self.awaiting.add(name)
+                self.check_deadlock()
+                value = await computer.inputs.get()
+                self.awaiting.discard(name)
+                computer.provide_input(value)
+            else:
+                # nothing to await on, check back after everybody else had a turn
+                self.stuck.add(name)
+                self.check_deadlock()
+                await asyncio.sleep(0)
+            self.wait_time[name] += time.perf_counter() - started
+
+    def check_deadlock(self):
+        """
+        Raise Deadlock when no machine that hasn't halted can make progress
+        A machine awaiting a queue that already has a value in it is about to wake up, so it doesn't count as blocked
+        :return: void
+        """
+        for name, computer in self.machines.items():
+            if computer.finished or name in self.stuck:
+                continue
+            if name in self.awaiting and computer.inputs.empty():
+                continue
+            return
+        raise Deadlock(f"every running machine is waiting on input: "
+                       f"{sorted(self.stuck | self.awaiting)}")
+
+    async def run(self):
+        """
+        Run every machine until all of them halt
+        :return: void
+        """
+        await asyncio.gather(*(self.run_machine(name) for name in self.machines))
+
+    def instruction_counts(self):
+        """
+        Instructions executed per machine, busiest machine first
+        :return: [(name, instructions executed, seconds spent waiting on input)]
+        """
+        return sorted(((name, computer.instructions_executed, self.wait_time[name])
+                       for name, computer in self.machines.items()), key=lambda row: row[1], reverse=True)
+
+
+def daisy_chain(program, count, first_input, slice_size=1000):
+    """
+    Build a scheduler where every machine's output queue is the next machine's input queue
+    :param program: array('q') or int[]
+    :param count: number of machines
+    :param first_input: values fed into the first machine
+    :param slice_size: int
+    :return: (scheduler, output queue of the last machine)
+    """
+
+    scheduler = Scheduler(slice_size)
+    queue = asyncio.Queue()
+    for value in first_input:
+        queue.put_nowait(value)
+
+    for i in range(count):
+        output = asyncio.Queue()
+        scheduler.add(f"machine-{i}", IntCodeComputer(program, inputs=queue, outputs=output))
+        queue = output
+
+    return scheduler, queue
+
+
+async def main():
+    # every machine reads a value, adds one and passes it on
+    scheduler, output = daisy_chain([3, 9, 1001, 9, 1, 9, 4, 9, 99, 0], 100, [0])
+    await scheduler.run()
+    print(output.get_nowait())
+    for name, instructions, waited in scheduler.instruction_counts()[:5]:
+        print(f"{name}: {instructions} instructions, {waited:.6f}s waiting")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
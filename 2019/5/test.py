@@ -1,15 +1,64 @@
-import math
+def n_choose_k(n, k):
+    """
+    Exact binomial coefficient by multiplicative reduction
+    Each step multiplies by the next numerator term and divides by the next denominator term, the running value is
+    always a binomial coefficient itself so the division is exact and nothing gets as big as a factorial
+    :param n: int
+    :param k: int
+    :return: int
+    """
+    if k < 0 or k > n:
+        return 0
+    k = min(k, n - k)
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+def pascal_row(n, length=None):
+    """
+    The start of row n of Pascal's triangle, built multiplicatively
+    :param n: int
+    :param length: last k to build the row up to, the whole row when left out
+    :return: list of int, C(n, 0) to C(n, length)
+    """
+    if length is None or length > n:
+        length = n
+    row = [1]
+    for k in range(length):
+        row.append(row[-1] * (n - k) // (k + 1))
+    return row
 
 
 def calculate_odds(max, ball_count):
-    combinations = math.factorial(max)
-    denominator = math.factorial(ball_count) * math.factorial(max - ball_count)
+    return n_choose_k(max, ball_count)
+
+
+def calculate_odds_batch(configurations):
+    """
+    Odds for many (pool, draw) pairs, configurations are grouped by pool and every pool's row is only built once,
+    up to the deepest draw asked of it. C(n, k) == C(n, n - k) so a row never goes past the middle
+    :param configurations: iterable of (max, ball_count)
+    :return: list of int, one per configuration
+    """
+    configurations = list(configurations)
+
+    depths = {}
+    for pool, ball_count in configurations:
+        if 0 <= ball_count <= pool:
+            depths[pool] = max(depths.get(pool, 0), min(ball_count, pool - ball_count))
+    rows = {pool: pascal_row(pool, depth) for pool, depth in depths.items()}
 
-    return combinations / denominator
+    odds = []
+    for pool, ball_count in configurations:
+        odds.append(rows[pool][min(ball_count, pool - ball_count)] if 0 <= ball_count <= pool else 0)
+    return odds
 
 
 def main():
 
     print(calculate_odds(39, 5))
 
-main()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -45,16 +45,90 @@ In your expense report, what is the product of the three entries that sum to 202
 from functools import reduce
 import operator
 
-input1 = []
-with open('input.txt') as my_file:
-    for line in my_file:
-        input1.append(int(line))
+
+def load_input(file_path='input.txt'):
+    """
+    Read the expense report lazily, one entry per line
+    :param file_path: str
+    :return: generator of int
+    """
+    with open(file_path) as my_file:
+        for line in my_file:
+            yield int(line)
 
 
 # The brute force way is to actually sum each number against every other number
 # This became inefficient when they added in the 3rd number
 def main():
-    subset_sum(input1, 2020)
+    report = list(load_input())
+    for k in (2, 3):
+        entries = k_sum(report, 2020, k)
+        print(f"sum{list(entries)}=2020")
+        print(f"Their products are {reduce(operator.mul, entries, 1)}")
+
+
+def k_sum(numbers, target, k):
+    """
+    Find k entries that add up to target
+    The entries are sorted once, a single entry is a set lookup, two entries are found with a hash set and three
+    or more by fixing the smallest entries and closing two pointers in on the rest
+    :param numbers: the expense report
+    :param target: int
+    :param k: how many entries to add up, at least 1
+    :return: tuple of entries, smallest first, or None
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    if k == 1:
+        return (target,) if target in set(numbers) else None
+
+    entries = sorted(numbers)
+    if k == 2:
+        return two_sum(entries, target, 0)
+    return sorted_k_sum(entries, target, k, 0)
+
+
+def two_sum(entries, target, start):
+    seen = set()
+    for i in range(start, len(entries)):
+        if target - entries[i] in seen:
+            return target - entries[i], entries[i]
+        seen.add(entries[i])
+    return None
+
+
+def sorted_k_sum(entries, target, k, start):
+    """
+    k-sum over the sorted entries from start on, k is at least 2
+    :return: tuple of entries or None
+    """
+    end = len(entries)
+    if k == 2:
+        low, high = start, end - 1
+        while low < high:
+            total = entries[low] + entries[high]
+            if total == target:
+                return entries[low], entries[high]
+            if total < target:
+                low += 1
+            else:
+                high -= 1
+        return None
+
+    largest = sum(entries[end - k + 1:])
+    for i in range(start, end - k + 1):
+        if i > start and entries[i] == entries[i - 1]:
+            continue
+        # the k smallest entries left are already too big
+        if sum(entries[i:i + k]) > target:
+            break
+        # even the biggest entries can't make up the difference
+        if entries[i] + largest < target:
+            continue
+        rest = sorted_k_sum(entries, target - entries[i], k - 1, i + 1)
+        if rest is not None:
+            return (entries[i],) + rest
+    return None
 
 
 def subset_sum(numbers, target, partial=[]):
@@ -45,12 +45,24 @@ Given the same example list from above:
 2-9 c: ccccccccc is invalid: both position 2 and position 9 contain c.
 
 """
+from array import array
+import mmap
+import os
+import re
 
+# 1-3 a: abcde
+POLICY = re.compile(rb'([0-9]+)-([0-9]+) (.): (\S*)')
 
-input = []
-with open('input.txt') as my_file:
-    for line in my_file:
-        input.append(line)
+
+def load_input(file_path='input.txt'):
+    """
+    Yield the policy lines as they are read, nothing is opened until the first one is asked for
+    :param file_path: str
+    :return: generator of policy strings
+    """
+    with open(file_path) as my_file:
+        for line in my_file:
+            yield line
 
 
 class Policy:
@@ -124,14 +136,108 @@ def parse_policy(string):
     return Policy(min_count, max_count, letter, password)
 
 
+class PolicyTable:
+    """
+    Every policy in a password file stored as columns rather than one Policy object per line
+    The passwords are never copied out, each row keeps the offsets of its password in the shared buffer
+    """
+
+    def __init__(self, buffer):
+        """
+        :param buffer: the raw file contents, bytes or anything bytes-like such as an mmap
+        """
+        self.buffer = buffer
+        self.min_counts = array('L')
+        self.max_counts = array('L')
+        self.letters = bytearray()
+        self.starts = array('Q')
+        self.ends = array('Q')
+
+        for match in POLICY.finditer(buffer):
+            self.min_counts.append(int(match.group(1)))
+            self.max_counts.append(int(match.group(2)))
+            self.letters.append(buffer[match.start(3)])
+            self.starts.append(match.start(4))
+            self.ends.append(match.end(4))
+
+    def __len__(self):
+        return len(self.letters)
+
+    def count_valid(self):
+        """
+        Check every row against both the count policy and the Toboggan position policy in a single pass
+        Counting uses bytes.count over the password's slice of the buffer so no password string is ever built
+        :return: (valid by count, valid by position)
+        """
+
+        buffer = self.buffer
+        valid_count = 0
+        valid_position = 0
+
+        for min_count, max_count, letter, start, end in zip(self.min_counts, self.max_counts, self.letters,
+                                                            self.starts, self.ends):
+            if min_count <= buffer.count(letter, start, end) <= max_count:
+                valid_count += 1
+
+            # Toboggans don't know about index 0
+            index_one = start + min_count - 1
+            index_two = start + max_count - 1
+            first = index_one < end and buffer[index_one] == letter
+            second = index_two < end and buffer[index_two] == letter
+            if first != second:
+                valid_position += 1
+
+        return valid_count, valid_position
+
+
+def load_policy_table(file_path='input.txt'):
+    with open(file_path, 'rb') as my_file:
+        return PolicyTable(my_file.read())
+
+
+def stream_policy_tables(file_path='input.txt', batch_size=65536):
+    """
+    Memory map a password file and hand it out as PolicyTables of at most batch_size lines
+    Only the current batch's lines are ever copied out of the mapping, so memory stays flat however big the file
+    is and the OS pages the file in as the scan goes
+    :param file_path: str
+    :param batch_size: lines per table
+    :return: generator of PolicyTable
+    """
+    with open(file_path, 'rb') as my_file:
+        if os.fstat(my_file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(my_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = 0
+            while start < len(data):
+                end = start
+                for _ in range(batch_size):
+                    end = data.find(b'\n', end) + 1
+                    if not end:
+                        end = len(data)
+                        break
+                yield PolicyTable(data[start:end])
+                start = end
+
+
+def count_valid_streaming(file_path='input.txt', batch_size=65536):
+    """
+    Validate a password file batch by batch, each batch is checked as soon as it's parsed
+    :return: (valid by count, valid by position)
+    """
+    valid_count = 0
+    valid_position = 0
+    for table in stream_policy_tables(file_path, batch_size):
+        count, position = table.count_valid()
+        valid_count += count
+        valid_position += position
+    return valid_count, valid_position
+
+
 def main():
-    valid_passwords = 0
-    for item in input:
-        policy = parse_policy(item)
-        if policy.is_valid_toboggan_password():
-            valid_passwords += 1
+    valid_count, valid_position = count_valid_streaming()
 
-    print(valid_passwords)
+    print(valid_position)
 
 
 if __name__ == '__main__':
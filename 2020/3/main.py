@@ -60,10 +60,31 @@ Starting at the top-left corner of your map and following a slope of right 3 and
 """
 
 
-input = []
-with open('input.txt') as my_file:
-    for line in my_file:
-        input.append(line.strip('\n'))
+def load_input(file_path='input.txt'):
+    """
+    Yield the map one row at a time
+    :param file_path: str
+    :return: generator of rows
+    """
+    with open(file_path) as my_file:
+        for line in my_file:
+            yield line.strip('\n')
+
+
+# '#' is a tree, reading a row backwards through this gives the binary digits of its bitmask
+TREE_BITS = str.maketrans('#.', '10')
+
+# (right, down) slopes for part 2
+SLOPES = [(1, 1), (3, 1), (5, 1), (7, 1), (1, 2)]
+
+
+def row_bitmask(row):
+    """
+    Bit x is set when there's a tree in column x
+    :param row: like '..##.......'
+    :return: int
+    """
+    return int(row[::-1].translate(TREE_BITS), 2)
 
 
 class Map:
@@ -71,6 +92,59 @@ class Map:
         self.grid = grid_array
         self.grid_width = len(grid_array[0])
         self.grid_height = len(grid_array)
+        self.row_masks = [row_bitmask(row) for row in grid_array]
+
+    def is_tree(self, x, y):
+        return self.grid[y][x % self.grid_width] == '#'
+
+    def row_mask(self, y):
+        return self.row_masks[y]
+
+
+class BitMap:
+    """
+    The map packed one bit per square, every row takes the same number of bytes in one shared bytearray
+    Columns wrap around, the pattern repeats to the right forever
+    """
+
+    def __init__(self, rows):
+        """
+        :param rows: iterable of rows like '..##.......', consumed once
+        """
+        self.data = bytearray()
+        self.grid_width = None
+        self.grid_height = 0
+
+        for row in rows:
+            if self.grid_width is None:
+                self.grid_width = len(row)
+                self.row_bytes = (self.grid_width + 7) // 8
+            self.data += row_bitmask(row).to_bytes(self.row_bytes, 'little')
+            self.grid_height += 1
+
+    @classmethod
+    def from_file(cls, file_path='input.txt'):
+        return cls(load_input(file_path))
+
+    def is_tree(self, x, y):
+        x %= self.grid_width
+        return self.data[y * self.row_bytes + (x >> 3)] >> (x & 7) & 1 == 1
+
+    def row_mask(self, y):
+        start = y * self.row_bytes
+        return int.from_bytes(self.data[start:start + self.row_bytes], 'little')
+
+    def trees_at(self, xs, ys):
+        """
+        Look up many squares at once
+        :param xs: sequence of columns, any size, they wrap around
+        :param ys: sequence of rows, same length as xs
+        :return: bytearray with 1 where there's a tree and 0 where there isn't
+        """
+        data = self.data
+        width = self.grid_width
+        row_bytes = self.row_bytes
+        return bytearray(data[y * row_bytes + (x % width >> 3)] >> (x % width & 7) & 1 for x, y in zip(xs, ys))
 
 
 class Cursor:
@@ -85,15 +159,22 @@ class Cursor:
         self.y = y
 
     def inspect(self):
-        if self.map.grid[self.y][self.x] == '#':
+        if self.map.is_tree(self.x, self.y):
             self.trees_encountered += 1
 
+    def slide(self, right, down):
+        """
+        Move X >>>> right spaces and Y >>> down, check and add tree then stop at end
+        We want to 'wrap' over in x to the start so let's use modulo division to wrap around
+        """
+        while self.y + down < self.map.grid_height:
+            self.x = (self.x + right) % self.map.grid_width
+            self.y += down
+            self.inspect()
+
     def slide_alpha(self):
         # Move X >>>> 1 spaces and Y >>> 1 check and add tree then stop at end
-        while self.y < self.map.grid_height - 1:
-            self.x = (self.x + 1) % self.map.grid_width
-            self.y += 1
-            self.inspect()
+        self.slide(1, 1)
 
     def slide_beta(self):
         """
@@ -103,56 +184,87 @@ class Cursor:
         """
 
         # Move X >>>> 3 spaces and Y >>> 1 check and add tree then stop at end
-        while self.y < self.map.grid_height - 1:
-            self.x = (self.x + 3) % self.map.grid_width
-            self.y += 1
-            self.inspect()
+        self.slide(3, 1)
 
     def slide_gamma(self):
         # Move X >>>> 5 spaces and Y >>> 1 check and add tree then stop at end
-        while self.y < self.map.grid_height - 1:
-            self.x = (self.x + 5) % self.map.grid_width
-            self.y += 1
-            self.inspect()
+        self.slide(5, 1)
 
     def slide_delta(self):
         # Move X >>>> 7 spaces and Y >>> 1 check and add tree then stop at end
-        while self.y < self.map.grid_height - 1:
-            self.x = (self.x + 7) % self.map.grid_width
-            self.y += 1
-            self.inspect()
+        self.slide(7, 1)
 
     def slide_epsilon(self):
-        # Move X >>>> 3 spaces and Y >>> 1 check and add tree then stop at end
-        while self.y < self.map.grid_height - 1:
-            self.x = (self.x + 1) % self.map.grid_width
-            self.y += 2
-            self.inspect()
+        # Move X >>>> 1 spaces and Y >>> 2 check and add tree then stop at end
+        self.slide(1, 2)
 
-def main():
-    map = Map(input)
-    cursor = Cursor(map)
 
-    cursor.slide_alpha()
-    a_trees = cursor.trees_encountered
+def count_trees(map, slopes):
+    """
+    Count the trees on every slope in one pass over the rows
+    A slope with a given down only lands on rows that are a multiple of down, its column there is known
+    right away from the row number, so every row is visited once no matter how many slopes there are
+    :param map: Map or BitMap
+    :param slopes: list of (right, down)
+    :return: list of tree counts, in the same order as slopes
+    """
+
+    counts = [0] * len(slopes)
+    width = map.grid_width
+    for y in range(1, map.grid_height):
+        mask = map.row_mask(y)
+        if not mask:
+            continue
+        for i, (right, down) in enumerate(slopes):
+            if y % down == 0 and mask >> (y // down * right % width) & 1:
+                counts[i] += 1
+    return counts
+
 
-    cursor = Cursor(map)
-    cursor.slide_beta()
-    b_trees = cursor.trees_encountered
+def sweep_slopes(map, rights, downs):
+    """
+    Count the trees on every (right, down) with right from rights and down from downs, and rank them
+    Columns wrap around, so only right modulo the map width matters and every distinct column step is counted once.
+    Each row is visited once, and for every down that lands on it all the column steps are checked together
+    against the row's bitmask
+    :param map: Map or BitMap
+    :param rights: iterable of column steps
+    :param downs: iterable of row steps, all positive
+    :return: list of (trees, right, down), fewest trees first
+    """
 
-    cursor = Cursor(map)
-    cursor.slide_gamma()
-    g_trees = cursor.trees_encountered
+    width = map.grid_width
+    downs = sorted(set(downs))
+    rights = sorted(set(rights))
+    steps = sorted({right % width for right in rights})
+    counts = {down: [0] * len(steps) for down in downs}
 
-    cursor = Cursor(map)
-    cursor.slide_delta()
-    d_trees = cursor.trees_encountered
+    for y in range(1, map.grid_height):
+        mask = map.row_mask(y)
+        if not mask:
+            continue
+        for down in downs:
+            if y % down:
+                continue
+            k = y // down
+            counts[down] = [count + (mask >> (k * step % width) & 1) for count, step in zip(counts[down], steps)]
+
+    table = []
+    for down in downs:
+        trees_by_step = dict(zip(steps, counts[down]))
+        table.extend((trees_by_step[right % width], right, down) for right in rights)
+    table.sort()
+    return table
+
+
+def main():
+    map = BitMap.from_file()
 
-    cursor = Cursor(map)
-    cursor.slide_epsilon()
-    e_trees = cursor.trees_encountered
+    product = 1
+    for trees in count_trees(map, SLOPES):
+        product *= trees
 
-    print(a_trees * b_trees * g_trees * d_trees * e_trees)
+    print(product)
 
 
 if __name__ == '__main__':
@@ -58,10 +58,16 @@ how many passports are valid?
 """
 import re
 
-input = []
-with open('input.txt') as my_file:
-    for line in my_file:
-        input.append(line.strip('\n'))
+
+def load_input(file_path='input.txt'):
+    """
+    Yield the batch file line by line, a blank line separates two passports
+    :param file_path: str
+    :return: generator of lines
+    """
+    with open(file_path) as my_file:
+        for line in my_file:
+            yield line.strip('\n')
 
 
 class PassPort:
@@ -196,38 +202,29 @@ def passport_parser(raw):
         return PassPort(**map)
 
 
-def prepare_input(input):
+def prepare_input(lines):
     """
     Prepare the input as the fields are on separate lines
-    :param input:
-    :return:
+    :param lines: iterable of lines, like load_input()
+    :return: generator of one string per passport
     """
-    new_output = []
-
-    line_cursor = 0
     new_string = ""
 
-    while line_cursor < len(input):
-        if input[line_cursor]:
-            new_string = new_string + input[line_cursor] + " "
-            line_cursor += 1
-
-            if line_cursor == len(input):
-                # We're at the end, insert the last string
-                new_string = new_string.strip()
-                new_output.append(new_string)
+    for line in lines:
+        if line:
+            new_string = new_string + line + " "
         else:
-            # Skip on blanks, append what was found
-            line_cursor += 1
-            new_string = new_string.strip()
-            new_output.append(new_string)
+            # Skip on blanks, hand back what was found
+            yield new_string.strip()
             new_string = ""
 
-    return new_output
+    if new_string:
+        # We're at the end, hand back the last string
+        yield new_string.strip()
 
 
 def main():
-    p_input = prepare_input(input)
+    p_input = prepare_input(load_input())
     valid_passports = 0
     for item in p_input:
         passport = passport_parser(item)
@@ -41,10 +41,17 @@ As a sanity check, look through your list of boarding passes. What is the highes
 """
 from operator import itemgetter
 from pprint import pprint
-input = []
-with open('input.txt') as my_file:
-    for line in my_file:
-        input.append(line.strip())
+
+
+def load_input(file_path='input.txt'):
+    """
+    Yield one boarding pass code per line
+    :param file_path: str
+    :return: generator of seat codes
+    """
+    with open(file_path) as my_file:
+        for line in my_file:
+            yield line.strip()
 
 
 def calculate_seat(seat_code):
@@ -84,7 +91,7 @@ def main():
     seat_ids = []
     highest_seat = 0
     seat_chart = []
-    for item in input:
+    for item in load_input():
         row = recurse_row(signal_string=item)
         column = recurse_column(signal_string=item)
         seat_id = (row * 8) + column